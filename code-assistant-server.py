@@ -8,22 +8,86 @@ standards compliance and up-to-date library documentation.
 """
 
 import asyncio
-import json
+import itertools
 import os
-import subprocess
+import re
 import sys
-from typing import List, Optional, Dict, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterator, Set, Tuple
 import tempfile
 import signal
 import atexit
+from string import Template
 
+import ahocorasick
+import orjson
+import simdjson
 from fastmcp import FastMCP
-from agents import Agent, Runner, tool
+from agents import Agent, Runner, function_tool
 from pydantic import BaseModel
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
 # Initialize the MCP server
 mcp = FastMCP("Code Assistant Server")
 
+# Persistent event loop for agent runs, so each tool call doesn't pay for loop setup
+_loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name="agent-loop", daemon=True).start()
+
+# simdjson parsers aren't thread-safe, so each thread reuses its own
+_parsers = threading.local()
+
+def _json_parser() -> simdjson.Parser:
+    """Return this thread's simdjson parser, creating it on first use"""
+    parser = getattr(_parsers, "parser", None)
+    if parser is None:
+        parser = _parsers.parser = simdjson.Parser()
+    return parser
+
+# Below this size the simdjson FFI overhead outweighs a full orjson parse
+SIMDJSON_MIN_BYTES = 200
+
+def parse_message(payload: bytes) -> Any:
+    """Parse a JSON payload, lazily with simdjson when it is large enough to pay off"""
+    if len(payload) >= SIMDJSON_MIN_BYTES:
+        try:
+            return _json_parser().parse(payload)
+        except (ValueError, RuntimeError):
+            # simdjson rejected the document, or this thread's parser is still pinned by a live
+            # Array/Object; let orjson have a go before giving up
+            pass
+    return orjson.loads(payload)
+
+def value_at(document: Any, pointer: str) -> Any:
+    """Return the value at a JSON pointer in a parsed document as plain Python objects"""
+    if isinstance(document, (simdjson.Object, simdjson.Array)):
+        value = document.at_pointer(pointer)
+        # Copy containers out so nothing keeps this thread's parser pinned
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+        return value
+    value = document
+    for key in pointer.split("/")[1:]:
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+def iter_text_blocks(blocks: Any) -> Iterator[str]:
+    """Yield the text of each MCP content block in a content array"""
+    if not isinstance(blocks, list):
+        return
+    for block in blocks:
+        text = block.get("text") if isinstance(block, dict) else None
+        if isinstance(text, str):
+            yield text
+
 class CodeRequest(BaseModel):
     """Model for code generation requests"""
     request: str
@@ -32,55 +96,296 @@ class CodeRequest(BaseModel):
     include_tests: bool = False
     include_docs: bool = True
 
+# Seconds an internal server gets to answer the MCP initialize handshake, and relaunches before giving up
+STARTUP_TIMEOUT = float(os.getenv("MCP_STARTUP_TIMEOUT", "30"))
+STARTUP_ATTEMPTS = 3
+
+# Largest single message accepted from an internal server; asyncio's 64 KiB default is
+# smaller than many context7 documentation responses
+STREAM_LIMIT = int(os.getenv("MCP_STREAM_LIMIT", str(16 * 1024 * 1024)))
+
+class JsonRpcClient:
+    """Multiplexes concurrent JSON-RPC requests over one subprocess's stdin/stdout"""
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        # Each pending request's future and the JSON pointer its caller wants from the response
+        self.pending: Dict[int, Tuple[asyncio.Future, str]] = {}
+        self._ids = itertools.count(1)
+        self._reader = asyncio.get_running_loop().create_task(self._read_responses())
+    
+    @classmethod
+    async def spawn(cls, cmd: List[str]) -> "JsonRpcClient":
+        """Start cmd as a subprocess on the running loop and wait until it completes the MCP handshake"""
+        for attempt in range(1, STARTUP_ATTEMPTS + 1):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                # Inherit our stderr: the servers' logs reach the operator and an unread pipe can't fill up
+                stderr=None,
+                stdin=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT
+            )
+            client = cls(process)
+            try:
+                await asyncio.wait_for(client.initialize(), timeout=STARTUP_TIMEOUT)
+                return client
+            except (asyncio.TimeoutError, ConnectionError) as e:
+                print(f"{cmd[0]} not ready (attempt {attempt}/{STARTUP_ATTEMPTS}): {e!r}", file=sys.stderr)
+                if process.returncode is None:
+                    process.kill()
+                await process.wait()
+        
+        raise RuntimeError(f"{' '.join(cmd)} did not become ready after {STARTUP_ATTEMPTS} attempts")
+    
+    async def initialize(self):
+        """Perform the MCP initialize handshake so the server accepts requests"""
+        await self.request("initialize", {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "code-assistant", "version": "1.0"}
+        })
+        await self.notify("notifications/initialized", {})
+    
+    @property
+    def running(self) -> bool:
+        """Whether the subprocess is still alive"""
+        return self.process.returncode is None
+    
+    async def request(self, method: str, params: Dict[str, Any], pointer: str = "/result") -> Any:
+        """Send a request and wait for the value at pointer in its response (None if absent); must run on the client's loop"""
+        if self._reader.done():
+            raise ConnectionError("server output stream is closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = (future, pointer)
+        try:
+            request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            self.process.stdin.write(orjson.dumps(request, option=orjson.OPT_APPEND_NEWLINE))
+            await self.process.stdin.drain()
+            return await future
+        finally:
+            self.pending.pop(request_id, None)
+    
+    async def notify(self, method: str, params: Dict[str, Any]):
+        """Send a notification, which gets no response"""
+        notification = {"jsonrpc": "2.0", "method": method, "params": params}
+        self.process.stdin.write(orjson.dumps(notification, option=orjson.OPT_APPEND_NEWLINE))
+        await self.process.stdin.drain()
+    
+    def call(self, method: str, params: Dict[str, Any], pointer: str = "/result") -> Future:
+        """Thread-safe request() returning a concurrent future for the value at pointer"""
+        return asyncio.run_coroutine_threadsafe(self.request(method, params, pointer), _loop)
+    
+    async def _read_responses(self):
+        """Resolve pending futures by id as response lines arrive"""
+        try:
+            async for line in self.process.stdout:
+                self._dispatch(line)
+        except Exception as e:
+            # A message over STREAM_LIMIT leaves the stream unusable, so let the pool replace us
+            print(f"Dropping server with PID {self.process.pid}: {e}", file=sys.stderr)
+            if self.process.returncode is None:
+                self.process.kill()
+        finally:
+            for future, _ in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("server closed its output stream"))
+
+    def _dispatch(self, line: bytes):
+        """Parse a message once and hand the answered request just the field its caller asked for"""
+        # Both JSON parsers accept the trailing newline, so the line is parsed without another copy
+        try:
+            message = parse_message(line)
+            # Server-initiated requests and notifications carry a method, and their ids are the server's own
+            if "method" in message:
+                return
+            entry = self.pending.get(message.get("id"))
+        except (AttributeError, TypeError, ValueError):
+            return
+        if entry is None or entry[0].done():
+            return
+        future, pointer = entry
+        try:
+            future.set_result(value_at(message, pointer))
+        except (KeyError, IndexError, TypeError, ValueError):
+            # Error responses have no result, which callers already treat as a failed call
+            future.set_result(None)
+
+# Pre-warmed subprocesses per internal server, and the ceiling each pool may grow to
+POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("MCP_POOL_MAX_SIZE", str(POOL_SIZE * 2)))
+
+# Grow a pool in the background once fewer than this many processes are idle
+POOL_LOW_WATERMARK = 1
+
+# Seconds a server gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT = 5.0
+
+# Seconds a tool call waits for an internal server to respond
+RPC_TIMEOUT = 30.0
+
 class MCPServerManager:
-    """Manages internal MCP servers as subprocesses"""
+    """Manages internal MCP servers as pools of subprocesses"""
     
     def __init__(self):
-        self.processes: Dict[str, subprocess.Popen] = {}
+        # Parallel arrays with one slot per pooled server process
+        self.names: List[str] = []
+        self.clients: List[JsonRpcClient] = []
+        self.pool_commands: Dict[str, List[str]] = {}
+        self.pool_lock = threading.Lock()
+        self.refilling: Set[str] = set()
+        self.stopping = False
+        self.stopped = threading.Event()
         self.temp_files: List[str] = []
+    
+    def _spawn(self, name: str) -> JsonRpcClient:
+        """Spawn one subprocess for a pool on the agent loop and wrap it in a JSON-RPC client"""
+        client = asyncio.run_coroutine_threadsafe(
+            JsonRpcClient.spawn(self.pool_commands[name]), _loop
+        ).result()
+        with self.pool_lock:
+            if not self.stopping:
+                self.names.append(name)
+                self.clients.append(client)
+        if self.stopping:
+            client.process.kill()
+            raise RuntimeError(f"Not starting {name} server during shutdown")
+        print(f"Started {name} server with PID: {client.process.pid}", file=sys.stderr)
+        return client
+    
+    def start_pool(self, name: str, cmd: List[str], size: int = POOL_SIZE) -> List[int]:
+        """Pre-warm a pool of subprocesses running cmd and return their PIDs"""
+        self.pool_commands[name] = cmd
+        # Handshake waits overlap, so the pool is ready after the slowest process rather than all of them
+        with ThreadPoolExecutor(max_workers=max(size, 1)) as executor:
+            return [client.process.pid for client in executor.map(lambda _: self._spawn(name), range(size))]
+    
+    def _members(self, name: str) -> List[JsonRpcClient]:
+        """Return the clients in a pool; callers must hold pool_lock"""
+        return [c for n, c in zip(self.names, self.clients) if n == name]
+    
+    def _prune(self):
+        """Drop slots whose process has exited; callers must hold pool_lock"""
+        live = [i for i, c in enumerate(self.clients) if c.running]
+        if len(live) < len(self.clients):
+            self.names = [self.names[i] for i in live]
+            self.clients = [self.clients[i] for i in live]
+    
+    def _refill(self, name: str):
+        """Top up a pool from a background thread, at most one refill per pool at a time"""
+        with self.pool_lock:
+            if self.stopping or name in self.refilling:
+                return
+            self.refilling.add(name)
+        threading.Thread(target=self._refill_worker, args=(name,), daemon=True).start()
+    
+    def _refill_worker(self, name: str):
+        """Spawn processes until the pool has its target size and idle headroom"""
+        try:
+            while True:
+                with self.pool_lock:
+                    self._prune()
+                    clients = self._members(name)
+                if len(clients) >= POOL_MAX_SIZE:
+                    return
+                idle = sum(1 for c in clients if not c.pending)
+                if len(clients) >= POOL_SIZE and idle >= POOL_LOW_WATERMARK:
+                    return
+                self._spawn(name)
+        except Exception as e:
+            print(f"Failed to refill {name} pool: {e}", file=sys.stderr)
+        finally:
+            with self.pool_lock:
+                self.refilling.discard(name)
+    
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[JsonRpcClient]:
+        """Pick the least-loaded live client in a pool for the duration of one request"""
+        with self.pool_lock:
+            members = self._members(name)
+        clients = [c for c in members if c.running]
+        lost = len(clients) < len(members)
+        if not clients:
+            self._refill(name)
+            raise RuntimeError(f"No {name} server is running")
         
-    def start_standards_server(self) -> int:
-        """Start the standards MCP server and return its port"""
+        client = min(clients, key=lambda c: len(c.pending))
+        idle = sum(1 for c in clients if c is not client and not c.pending)
+        if lost or idle < POOL_LOW_WATERMARK:
+            self._refill(name)
+        try:
+            yield client
+        finally:
+            self.release(name, client)
+    
+    def release(self, name: str, client: JsonRpcClient):
+        """Hand a client back after a request, replacing it if its process has exited"""
+        if not client.running:
+            self._refill(name)
+    
+    def start_standards_server(self) -> List[int]:
+        """Start the standards MCP server pool and return its PIDs"""
         try:
             # Use the existing standards-server.py
-            process = subprocess.Popen([
-                sys.executable, "standards-server.py"
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-            
-            self.processes["standards"] = process
-            print(f"Started standards server with PID: {process.pid}")
-            return process.pid
+            return self.start_pool("standards", [sys.executable, "standards-server.py"])
         except Exception as e:
             print(f"Failed to start standards server: {e}")
             raise
     
-    def start_context7_server(self) -> int:
-        """Start a context7 MCP server and return its port"""
+    def start_context7_server(self) -> List[int]:
+        """Start the context7 MCP server pool and return its PIDs"""
         try:
             # Start context7 server using Docker
-            process = subprocess.Popen([
-                "docker", "run", "-i", "--rm", "mcp/context7"
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-            
-            self.processes["context7"] = process
-            print(f"Started context7 server with PID: {process.pid}")
-            return process.pid
+            return self.start_pool("context7", ["docker", "run", "-i", "--rm", "mcp/context7"])
         except Exception as e:
             print(f"Failed to start context7 server: {e}")
             raise
     
+    async def _stop_server(self, name: str, process: asyncio.subprocess.Process):
+        """Terminate one server process, killing it if it doesn't exit in time"""
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), timeout=STOP_TIMEOUT)
+            print(f"Stopped {name} server")
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            print(f"Force killed {name} server")
+        except Exception as e:
+            print(f"Error stopping {name} server: {e}")
+    
+    def _take_processes(self) -> Optional[List[tuple]]:
+        """Empty the pools and block refills; None if another caller is already stopping them"""
+        with self.pool_lock:
+            if self.stopping:
+                return None
+            self.stopping = True
+            processes = [(name, c.process) for name, c in zip(self.names, self.clients)]
+            self.names, self.clients = [], []
+        return processes
+    
+    async def _stop_processes(self, processes: List[tuple]):
+        """Terminate every process at once and wait for them together, so shutdown takes the slowest exit, not the sum"""
+        try:
+            await asyncio.gather(*(self._stop_server(name, process) for name, process in processes))
+        finally:
+            self.stopped.set()
+    
+    async def stop_all_servers_async(self):
+        """Stop all managed MCP servers from the agent loop"""
+        processes = self._take_processes()
+        if processes is not None:
+            await self._stop_processes(processes)
+    
     def stop_all_servers(self):
         """Stop all managed MCP servers"""
-        for name, process in self.processes.items():
-            try:
-                process.terminate()
-                process.wait(timeout=5)
-                print(f"Stopped {name} server")
-            except subprocess.TimeoutExpired:
-                process.kill()
-                print(f"Force killed {name} server")
-            except Exception as e:
-                print(f"Error stopping {name} server: {e}")
+        processes = self._take_processes()
+        if processes is None:
+            # Already being stopped (e.g. from a signal) - don't return until that finishes
+            self.stopped.wait()
+        else:
+            asyncio.run_coroutine_threadsafe(self._stop_processes(processes), _loop).result()
         
         # Clean up temp files
         for temp_file in self.temp_files:
@@ -92,6 +397,81 @@ class MCPServerManager:
 # Global server manager
 server_manager = MCPServerManager()
 
+async def _call(client: JsonRpcClient, method: str, params: Dict[str, Any], pointer: str = "/result") -> Any:
+    """Await a request from any event loop, giving up after RPC_TIMEOUT"""
+    return await asyncio.wait_for(asyncio.wrap_future(client.call(method, params, pointer)), timeout=RPC_TIMEOUT)
+
+# resolve-library-id lists candidate libraries, each with a line like this one
+LIBRARY_ID_PATTERN = re.compile(r"Context7-compatible library ID:\s*(/\S+)")
+
+async def context7_pipeline(client: JsonRpcClient, library_name: str, topic: str = "") -> AsyncIterator[str]:
+    """Resolve a library name and yield the text blocks of its documentation"""
+    if library_name.startswith("/"):
+        # Already a Context7 ID, so the resolve round trip can be skipped
+        library_id = library_name
+    else:
+        blocks = await _call(client, "tools/call", {
+            "name": "resolve-library-id",
+            "arguments": {"libraryName": library_name}
+        }, "/result/content")
+        match = LIBRARY_ID_PATTERN.search("\n".join(iter_text_blocks(blocks)))
+        if match is None:
+            return
+        library_id = match.group(1)
+    
+    arguments = {"context7CompatibleLibraryID": library_id}
+    if topic:
+        arguments["topic"] = topic
+    blocks = await _call(client, "tools/call", {"name": "get-library-docs", "arguments": arguments}, "/result/content")
+    for text in iter_text_blocks(blocks):
+        yield text
+
+# Request keywords mapped to analysis tags, matched in a single Aho-Corasick pass
+KEYWORD_TAGS = {
+    "test": "testing",
+    "unittest": "testing",
+    "api": "api",
+    "rest": "api",
+    "data": "data",
+    "pandas": "data",
+    "web": "web",
+    "html": "web"
+}
+
+_keyword_automaton = ahocorasick.Automaton()
+for _keyword, _tag in KEYWORD_TAGS.items():
+    _keyword_automaton.add_word(_keyword, _tag)
+_keyword_automaton.make_automaton()
+
+def keyword_tags(text: str) -> Set[str]:
+    """Return the analysis tags whose keywords appear anywhere in text"""
+    return {tag for _, tag in _keyword_automaton.iter(text.lower())}
+
+# Libraries suggested for each tag, in the order they are added to the analysis
+TAG_LIBRARIES = (
+    ("api", ["requests", "fastapi"]),
+    ("data", ["pandas", "numpy"]),
+    ("web", ["flask", "django"])
+)
+
+# Agent prompt for generate_code; $libraries_line is empty when no libraries were requested
+PROMPT_TEMPLATE = Template("""
+Generate $language code for the following request:
+
+$request
+
+Requirements:
+- Language: $language
+- Include tests: $include_tests
+- Include documentation: $include_docs
+${libraries_line}
+Please follow this workflow:
+1. Analyze the requirements
+2. Get the coding standards for the language
+3. Get documentation for any libraries needed
+4. Generate the code with proper standards compliance
+""")
+
 class CodeAssistantAgent:
     """Main agent that orchestrates code generation with standards and documentation"""
     
@@ -102,79 +482,47 @@ class CodeAssistantAgent:
     def setup_agent(self):
         """Setup the OpenAI agent with tools for accessing internal MCP servers"""
         
-        @tool
-        def get_coding_standards(language: str = "python") -> str:
+        @function_tool
+        async def get_coding_standards(language: str = "python") -> str:
             """Get coding standards for a specific programming language"""
             try:
                 # Communicate with standards server
-                process = server_manager.processes.get("standards")
-                if not process:
+                if "standards" not in server_manager.pool_commands:
                     return "Standards server not available"
                 
-                # Create a simple request to get standards
-                request = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "resources/read",
-                    "params": {
+                # Request the language checklist from the least busy standards server
+                with server_manager.acquire("standards") as client:
+                    text = await _call(client, "resources/read", {
                         "uri": f"standards://checklist/{language}"
-                    }
-                }
-                
-                # Send request to standards server
-                process.stdin.write((json.dumps(request) + "\n").encode())
-                process.stdin.flush()
+                    }, "/result/contents/0/text")
                 
-                # Read response (simplified - in production would need proper JSON-RPC handling)
-                response_line = process.stdout.readline().decode().strip()
-                if response_line:
-                    response = json.loads(response_line)
-                    if "result" in response and "contents" in response["result"]:
-                        return response["result"]["contents"][0]["text"]
+                if isinstance(text, str):
+                    return text
                 
                 return f"Coding standards for {language} retrieved successfully"
             except Exception as e:
                 return f"Error getting coding standards: {str(e)}"
         
-        @tool
-        def get_library_documentation(library_name: str, topic: str = "") -> str:
+        @function_tool
+        async def get_library_documentation(library_name: str, topic: str = "") -> str:
             """Get up-to-date documentation for a specific library"""
             try:
                 # Communicate with context7 server
-                process = server_manager.processes.get("context7")
-                if not process:
+                if "context7" not in server_manager.pool_commands:
                     return "Context7 server not available"
                 
-                # Create request to resolve library ID first
-                resolve_request = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "tools/call",
-                    "params": {
-                        "name": "resolve-library-id",
-                        "arguments": {
-                            "libraryName": library_name
-                        }
-                    }
-                }
-                
-                # Send request
-                process.stdin.write((json.dumps(resolve_request) + "\n").encode())
-                process.stdin.flush()
+                # Resolve the library and fetch its docs on the least busy context7 server
+                with server_manager.acquire("context7") as client:
+                    text = "\n".join([block async for block in context7_pipeline(client, library_name, topic)])
                 
-                # Read response (simplified)
-                response_line = process.stdout.readline().decode().strip()
-                if response_line:
-                    response = json.loads(response_line)
-                    # In a real implementation, we'd parse the response and make a follow-up call
-                    # to get-library-docs with the resolved library ID
-                    return f"Documentation for {library_name} retrieved successfully"
+                if text:
+                    return text
                 
                 return f"Library documentation for {library_name} not found"
             except Exception as e:
                 return f"Error getting library documentation: {str(e)}"
         
-        @tool
+        @function_tool
         def analyze_code_requirements(request: str, language: str) -> str:
             """Analyze the code request to determine what standards and libraries are needed"""
             # This tool helps the agent understand what context it needs to gather
@@ -186,21 +534,16 @@ class CodeAssistantAgent:
             }
             
             # Simple keyword-based analysis (could be enhanced with NLP)
-            request_lower = request.lower()
+            tags = keyword_tags(request)
             
-            if "test" in request_lower or "unittest" in request_lower:
+            if "testing" in tags:
                 analysis["standards_needed"].append("testing")
             
-            if "api" in request_lower or "rest" in request_lower:
-                analysis["suggested_libraries"].extend(["requests", "fastapi"])
+            for tag, libraries in TAG_LIBRARIES:
+                if tag in tags:
+                    analysis["suggested_libraries"].extend(libraries)
             
-            if "data" in request_lower or "pandas" in request_lower:
-                analysis["suggested_libraries"].extend(["pandas", "numpy"])
-            
-            if "web" in request_lower or "html" in request_lower:
-                analysis["suggested_libraries"].extend(["flask", "django"])
-            
-            return json.dumps(analysis, indent=2)
+            return orjson.dumps(analysis, option=orjson.OPT_INDENT_2).decode()
         
         # Create the agent with tools
         self.agent = Agent(
@@ -228,30 +571,20 @@ Always prioritize:
         """Generate code using the agent with standards and documentation context"""
         try:
             # Prepare the prompt for the agent
-            prompt = f"""
-Generate {code_request.language} code for the following request:
-
-{code_request.request}
-
-Requirements:
-- Language: {code_request.language}
-- Include tests: {code_request.include_tests}
-- Include documentation: {code_request.include_docs}
-"""
-            
+            libraries_line = ""
             if code_request.libraries:
-                prompt += f"- Use these libraries: {', '.join(code_request.libraries)}\n"
+                libraries_line = f"- Use these libraries: {', '.join(code_request.libraries)}\n"
             
-            prompt += """
-Please follow this workflow:
-1. Analyze the requirements
-2. Get the coding standards for the language
-3. Get documentation for any libraries needed
-4. Generate the code with proper standards compliance
-"""
+            prompt = PROMPT_TEMPLATE.substitute(
+                language=code_request.language,
+                request=code_request.request,
+                include_tests=code_request.include_tests,
+                include_docs=code_request.include_docs,
+                libraries_line=libraries_line
+            )
             
-            # Run the agent
-            result = Runner.run_sync(self.agent, prompt)
+            # Run the agent on the loop we were scheduled on, rather than a nested one
+            result = await Runner.run(self.agent, prompt)
             return result.final_output
             
         except Exception as e:
@@ -260,6 +593,60 @@ Please follow this workflow:
 # Global agent instance
 code_agent = CodeAssistantAgent()
 
+# Opt-in shortcut that answers simple requests from the standards checklist without an LLM round trip
+FAST_PATH_ENABLED = os.getenv("CODE_ASSISTANT_FAST_PATH", "").lower() in ("1", "true", "yes")
+
+FAST_PATH_TEMPLATE = Template("""# $language: $request
+
+No code was generated for this request. The fast path (CODE_ASSISTANT_FAST_PATH) answers simple
+requests without libraries or tests with the team checklist to follow, instead of calling the agent.
+Disable it to have the agent write the code.
+
+$checklist""")
+
+# Languages standards-server has a checklist for; requests in any other language always go to the agent
+FAST_PATH_LANGUAGES = frozenset({"python", "javascript", "sql"})
+
+# standards-server answers unknown languages with an ordinary resource starting with this heading
+CHECKLIST_NOT_FOUND = "# Language Not Found"
+
+# Checklists fetched from the standards server, keyed by language
+_checklist_cache: Dict[str, str] = {}
+
+def fetch_checklist(language: str) -> Optional[str]:
+    """Get a language checklist from the standards server, caching successful reads; None on any failure"""
+    if language not in _checklist_cache:
+        if "standards" not in server_manager.pool_commands:
+            return None
+        try:
+            with server_manager.acquire("standards") as client:
+                # _call cancels the request on timeout, so it can't linger in the client's pending map
+                text = asyncio.run_coroutine_threadsafe(_call(client, "resources/read", {
+                    "uri": f"standards://checklist/{language}"
+                }, "/result/contents/0/text"), _loop).result()
+        except Exception as e:
+            # A dead or slow standards pool only means the agent answers instead
+            print(f"No fast-path checklist for {language}: {e!r}", file=sys.stderr)
+            return None
+        if not isinstance(text, str) or text.startswith(CHECKLIST_NOT_FOUND):
+            return None
+        _checklist_cache[language] = text
+    return _checklist_cache[language]
+
+def use_fast_path(request: str, language: str, libraries: Optional[List[str]], include_tests: bool) -> bool:
+    """Whether a request is simple enough, and its language covered, for the fast path"""
+    return (FAST_PATH_ENABLED and not libraries and not include_tests
+            and language.lower() in FAST_PATH_LANGUAGES and "simple" in request.lower())
+
+def render_fast_path(language: str, request: str) -> Optional[str]:
+    """Render a fast-path answer, or None if the checklist is unavailable"""
+    checklist = fetch_checklist(language.lower())
+    if checklist is None:
+        return None
+    # Collapse whitespace so the request fits on the heading line
+    request = " ".join(request.split())
+    return FAST_PATH_TEMPLATE.substitute(language=language, request=request, checklist=checklist)
+
 @mcp.tool()
 def generate_code_with_context(
     request: str,
@@ -282,7 +669,13 @@ def generate_code_with_context(
         Generated code with standards compliance and proper documentation
     """
     try:
-        code_request = CodeRequest(
+        if use_fast_path(request, language, libraries, include_tests):
+            response = render_fast_path(language, request)
+            if response is not None:
+                return response
+        
+        # FastMCP has already validated the arguments against this signature
+        code_request = CodeRequest.model_construct(
             request=request,
             language=language,
             libraries=libraries or [],
@@ -290,14 +683,9 @@ def generate_code_with_context(
             include_docs=include_docs
         )
         
-        # Use asyncio to run the async method
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(code_agent.generate_code(code_request))
-            return result
-        finally:
-            loop.close()
+        # Run the async method on the persistent agent loop
+        future = asyncio.run_coroutine_threadsafe(code_agent.generate_code(code_request), _loop)
+        return future.result()
             
     except Exception as e:
         return f"Error in code generation: {str(e)}"
@@ -326,24 +714,52 @@ def get_server_status() -> Dict[str, Any]:
         "agent_ready": bool(code_agent.agent)
     }
     
-    for name, process in server_manager.processes.items():
-        if process and process.poll() is None:
+    for name in server_manager.pool_commands:
+        status[f"{name}_server"] = "stopped"
+    
+    # One pass over the slot arrays; a pool is running if any of its processes is
+    with server_manager.pool_lock:
+        slots = list(zip(server_manager.names, server_manager.clients))
+    for name, client in slots:
+        if client.running:
             status[f"{name}_server"] = "running"
-        else:
-            status[f"{name}_server"] = "stopped"
     
     return status
 
 def cleanup_on_exit():
     """Cleanup function to stop all servers on exit"""
+    _main_exiting.set()
     print("Shutting down code assistant server...")
     server_manager.stop_all_servers()
+    _loop.call_soon_threadsafe(_loop.stop)
 
-def signal_handler(signum, frame):
-    """Handle shutdown signals"""
+# Shutdown state for signal handling; _shutdown_started is only touched on the agent loop
+_shutdown_started = False
+_shutdown_complete = threading.Event()
+_main_exiting = threading.Event()
+
+async def _shutdown_on_signal(signum: int):
+    """Stop the servers on the agent loop, then interrupt the main thread so main() unwinds"""
+    global _shutdown_started
+    if _shutdown_started:
+        return
+    _shutdown_started = True
     print(f"Received signal {signum}, shutting down...")
-    cleanup_on_exit()
-    sys.exit(0)
+    await server_manager.stop_all_servers_async()
+    _shutdown_complete.set()
+    if not _main_exiting.is_set():
+        # A real signal aimed at the main thread interrupts whatever it is blocked in (the stdlib
+        # selector or uvloop); _thread.interrupt_main() only sets a flag that nothing polls
+        signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+
+def signal_handler(signum, frame):
+    """Handle shutdown signals by handing the work to the agent loop"""
+    # Runs between arbitrary bytecodes of the main thread, so do nothing that could block or re-enter
+    if _main_exiting.is_set():
+        return
+    if _shutdown_complete.is_set():
+        raise KeyboardInterrupt
+    _loop.call_soon_threadsafe(_loop.create_task, _shutdown_on_signal(signum))
 
 def main():
     """Main function to start the server and internal MCP servers"""
@@ -360,14 +776,12 @@ def main():
         sys.exit(1)
     
     try:
-        # Start internal MCP servers
+        # Start internal MCP servers concurrently so boot waits on the slowest, not the sum
         print("Starting internal MCP servers...")
-        server_manager.start_standards_server()
-        server_manager.start_context7_server()
-        
-        # Give servers time to start
-        import time
-        time.sleep(2)
+        starters = [server_manager.start_standards_server, server_manager.start_context7_server]
+        with ThreadPoolExecutor(max_workers=len(starters)) as executor:
+            for future in [executor.submit(start) for start in starters]:
+                future.result()
         
         print("Code Assistant MCP Server ready!")
         print("Available tools:")
@@ -376,6 +790,8 @@ def main():
         print("- get_server_status: Check status of internal servers")
         
         # Run the MCP server
+        if uvloop:
+            uvloop.install()
         mcp.run()
         
     except KeyboardInterrupt:
@@ -385,6 +801,13 @@ def main():
         sys.exit(1)
     finally:
         cleanup_on_exit()
+    
+    if _shutdown_complete.is_set():
+        # mcp.run() leaves a worker thread blocked reading stdin, and joining it at interpreter
+        # exit would wait for the client to close the pipe; everything is already stopped
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
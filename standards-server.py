@@ -3,6 +3,8 @@
 MCP Server that provides team coding standards as a markdown resource.
 """
 
+from functools import lru_cache
+
 from fastmcp import FastMCP
 
 # Initialize the MCP server
@@ -210,27 +212,7 @@ CODING_STANDARDS_CONTENT = """# Team Coding Standards
 These standards are living documents and should be updated as our team and technology stack evolves.
 """
 
-@mcp.resource(
-    uri="resource://coding-standards",
-    name="Team Coding Standards",
-    description="Comprehensive coding standards and best practices for our development team",
-    mime_type="text/markdown",
-    tags={"documentation", "standards", "guidelines"}
-)
-def get_coding_standards() -> str:
-    """Returns the team's coding standards as a markdown document."""
-    return CODING_STANDARDS_CONTENT
-
-@mcp.resource(
-    uri="standards://summary",
-    name="Coding Standards Summary",
-    description="A brief summary of key coding standards",
-    mime_type="text/markdown",
-    tags={"documentation", "summary"}
-)
-def get_standards_summary() -> str:
-    """Returns a summary of the most important coding standards."""
-    return """# Coding Standards Summary
+STANDARDS_SUMMARY_CONTENT = """# Coding Standards Summary
 
 ## Quick Reference
 
@@ -267,18 +249,34 @@ def get_standards_summary() -> str:
 For complete details, see the full coding standards document.
 """
 
+# Resources return str on purpose: FastMCP ships bytes as a base64 "blob" (a third larger,
+# and invisible to clients reading "text"), and the JSON-RPC encoder re-escapes text anyway,
+# so pre-encoded UTF-8 would never reach the wire as-is.
 @mcp.resource(
-    uri="standards://checklist/{language}",
-    name="Language-Specific Checklist",
-    description="Get a checklist for specific programming languages",
+    uri="resource://coding-standards",
+    name="Team Coding Standards",
+    description="Comprehensive coding standards and best practices for our development team",
     mime_type="text/markdown",
-    tags={"checklist", "language-specific"}
+    tags={"documentation", "standards", "guidelines"}
 )
-def get_language_checklist(language: str) -> str:
-    """Returns a checklist for the specified programming language."""
-    
-    checklists = {
-        "python": """# Python Code Review Checklist
+def get_coding_standards() -> str:
+    """Returns the team's coding standards as a markdown document."""
+    return CODING_STANDARDS_CONTENT
+
+@mcp.resource(
+    uri="standards://summary",
+    name="Coding Standards Summary",
+    description="A brief summary of key coding standards",
+    mime_type="text/markdown",
+    tags={"documentation", "summary"}
+)
+def get_standards_summary() -> str:
+    """Returns a summary of the most important coding standards."""
+    return STANDARDS_SUMMARY_CONTENT
+
+# Language-specific checklists, keyed by lowercase language name
+_CHECKLISTS = {
+    "python": """# Python Code Review Checklist
 
 ## Style and Formatting
 - [ ] Follows PEP 8 guidelines
@@ -306,8 +304,8 @@ def get_language_checklist(language: str) -> str:
 - [ ] Tests use descriptive names
 - [ ] Mocks used for external dependencies
 """,
-        
-        "javascript": """# JavaScript/TypeScript Code Review Checklist
+    
+    "javascript": """# JavaScript/TypeScript Code Review Checklist
 
 ## TypeScript Usage
 - [ ] Uses TypeScript for new code
@@ -334,8 +332,8 @@ def get_language_checklist(language: str) -> str:
 - [ ] Test files follow naming convention
 - [ ] Mocks used appropriately
 """,
-        
-        "sql": """# SQL Code Review Checklist
+    
+    "sql": """# SQL Code Review Checklist
 
 ## Style and Formatting
 - [ ] SQL keywords in UPPERCASE
@@ -361,21 +359,37 @@ def get_language_checklist(language: str) -> str:
 - [ ] Transaction boundaries appropriate
 - [ ] Error handling implemented
 """
-    }
-    
-    language_lower = language.lower()
-    if language_lower in checklists:
-        return checklists[language_lower]
-    else:
-        available_languages = ", ".join(checklists.keys())
-        return f"""# Language Not Found
+}
+
+_AVAILABLE_LANGS = ", ".join(_CHECKLISTS)
+
+_NOT_FOUND_TEMPLATE = """# Language Not Found
 
 The language '{language}' is not available in our checklist system.
 
-Available languages: {available_languages}
+Available languages: {langs}
 
 Please use one of the available languages or request a new checklist to be added.
 """
 
+# FastMCP can't derive a schema from an lru_cache wrapper, so the resource delegates here
+@lru_cache(maxsize=16)
+def _lookup_checklist(language: str) -> str:
+    """Returns the checklist for a language, or the not-found message, cached per name."""
+    return _CHECKLISTS.get(language.lower()) or _NOT_FOUND_TEMPLATE.format(
+        language=language, langs=_AVAILABLE_LANGS
+    )
+
+@mcp.resource(
+    uri="standards://checklist/{language}",
+    name="Language-Specific Checklist",
+    description="Get a checklist for specific programming languages",
+    mime_type="text/markdown",
+    tags={"checklist", "language-specific"}
+)
+def get_language_checklist(language: str) -> str:
+    """Returns a checklist for the specified programming language."""
+    return _lookup_checklist(language)
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
@@ -6,157 +6,403 @@ This script demonstrates how to use the code assistant server
 to generate code with proper standards and documentation.
 """
 
+import asyncio
+import contextlib
+import importlib.util
+import io
+import itertools
 import json
-import subprocess
+import logging
 import sys
-import time
 import os
+import signal
+import unittest
+import unittest.mock
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-def test_code_assistant():
-    """Test the code assistant server functionality"""
+# orjson is a server dependency; fall back to json so the script still runs before it is installed
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+    _loads = json.loads
+
+log = logging.getLogger("mcp-test")
+
+# The server refuses to start without a key, so the server tests are skipped rather than failed
+HAS_OPENAI_KEY = bool(os.environ.get("OPENAI_API_KEY"))
+
+# Seconds to wait for the server (and its internal servers) to answer initialize
+READY_TIMEOUT = 60
+
+# Seconds a batch of tool calls may take; code generation runs a full agent turn
+CALL_TIMEOUT = 300
+
+# Longest response line the reader accepts; generated code can far exceed asyncio's 64 KiB default
+STREAM_LIMIT = 16 * 1024 * 1024
+
+# Seconds the server gets to shut down cleanly before its process group is killed
+STOP_GRACE = 1.0
+
+def encode(request):
+    """Frame one JSON-RPC message for the server (MCP stdio is newline-delimited JSON)"""
+    return _dumps(request) + b"\n"
+
+# Handshake messages are constant, so encode them once at import
+INITIALIZE_REQ = encode({
+    "jsonrpc": "2.0",
+    "id": 0,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "test-code-assistant", "version": "1.0"}
+    }
+})
+INITIALIZED_NOTE = encode({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+# Tool calls made against the server, by name; sent together when the module starts
+TOOL_CALLS = {
+    "status": ("get_server_status", {}),
+    "languages": ("get_available_languages", {}),
+    "code": ("generate_code_with_context", {
+        "request": "Create a simple function to calculate the factorial of a number",
+        "language": "python",
+        "include_tests": True,
+        "include_docs": True
+    }),
+}
+
+# Every request gets a fresh id so pipelined responses can be matched to their calls (0 is initialize)
+_next_id = itertools.count(1).__next__
+
+def build_req(name: str, arguments: Dict[str, Any]) -> Tuple[int, bytes]:
+    """Encode a tools/call request under a fresh id, returning the id and the frame"""
+    req_id = _next_id()
+    return req_id, encode({
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "method": "tools/call",
+        "params": {
+            "name": name,
+            "arguments": arguments
+        }
+    })
+
+class ServerSession:
+    """JSON-RPC over the server's stdio; responses are matched to callers by id"""
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.pending: Dict[Any, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._read_responses())
+        self._stderr = asyncio.create_task(self._drain_stderr())
+    
+    async def call(self, request_id, frame: bytes) -> Dict[str, Any]:
+        """Send an encoded request and wait for the response with the same id"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await self.notify(frame)
+        return await future
+    
+    async def call_many(self, requests: List[Tuple[Any, bytes]]) -> List[Dict[str, Any]]:
+        """Send several (id, encoded request) pairs in a single write and wait for all the responses"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for request_id, _ in requests:
+            futures.append(loop.create_future())
+            self.pending[request_id] = futures[-1]
+        await self.notify(b"".join(frame for _, frame in requests))
+        return await asyncio.gather(*futures)
+    
+    async def notify(self, frame: bytes):
+        """Send an encoded message that gets no response"""
+        self.process.stdin.write(frame)
+        await self.process.stdin.drain()
+    
+    async def initialize(self):
+        """Run the MCP initialize handshake, returning as soon as the server answers"""
+        await self.call(0, INITIALIZE_REQ)
+        await self.notify(INITIALIZED_NOTE)
     
-    # Check if OPENAI_API_KEY is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("Error: OPENAI_API_KEY environment variable is required")
-        print("Please set it with: export OPENAI_API_KEY=your_api_key")
-        return False
+    async def wait_closed(self):
+        """Wait for the reader tasks to see the server's pipes close"""
+        await asyncio.gather(self._reader, self._stderr)
     
-    print("Testing Code Assistant MCP Server...")
+    async def _read_responses(self):
+        """Resolve pending calls as their responses arrive, in whatever order the server answers"""
+        try:
+            async for line in self.process.stdout:
+                # The server print()s its own progress to stdout too; skip anything that isn't a message
+                if not line.startswith(b"{"):
+                    continue
+                response = _loads(line)
+                future = self.pending.pop(response.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Server closed its output"))
+            self.pending.clear()
     
+    async def _drain_stderr(self):
+        """Copy the server's stderr to ours as it arrives, so a full pipe can never stall the server"""
+        async for line in self.process.stderr:
+            sys.stderr.buffer.write(line)
+            sys.stderr.buffer.flush()
+
+def signal_group(process: asyncio.subprocess.Process, signum: int):
+    """Signal the server and the internal servers it started, which share its session"""
     try:
-        # Start the code assistant server
+        os.killpg(process.pid, signum)
+    except ProcessLookupError:
+        pass
+
+async def stop_server(process: asyncio.subprocess.Process):
+    """Close the server's stdin and SIGTERM its group, then SIGKILL whatever outlives STOP_GRACE"""
+    process.stdin.close()
+    signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=STOP_GRACE)
+    except asyncio.TimeoutError:
+        signal_group(process, signal.SIGKILL)
+        await process.wait()
+
+class ServerClient:
+    """Runs the code assistant server and calls its tools synchronously from tests"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.session: Optional[ServerSession] = None
+    
+    def start(self):
+        """Launch the server and wait for it to answer the initialize handshake"""
+        self.loop.run_until_complete(self._start())
+    
+    async def _start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "code-assistant-server.py",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, stdin=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT, start_new_session=True)
+        self.session = ServerSession(self.process)
+        await asyncio.wait_for(self.session.initialize(), timeout=READY_TIMEOUT)
+    
+    def call_many(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Call several tools in one pipelined write and return their responses in order"""
+        requests = [build_req(name, arguments) for name, arguments in calls]
+        return self.loop.run_until_complete(
+            asyncio.wait_for(self.session.call_many(requests), timeout=CALL_TIMEOUT))
+    
+    def stop(self):
+        """Shut the server down and close the event loop"""
+        if self.process is not None:
+            self.loop.run_until_complete(self._stop())
+        self.loop.close()
+    
+    async def _stop(self):
+        await stop_server(self.process)
+        await self.session.wait_closed()
+
+@unittest.skipIf(not HAS_OPENAI_KEY, "OPENAI_API_KEY is not set (export OPENAI_API_KEY=your_api_key)")
+class CodeAssistantServerTest(unittest.TestCase):
+    """Tool calls against one code assistant server shared by the whole class"""
+    
+    server: Optional[ServerClient] = None
+    responses: Dict[str, Dict[str, Any]] = {}
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start the server once and send every tool call up front"""
         print("Starting code assistant server...")
-        process = subprocess.Popen([
-            sys.executable, "code-assistant-server.py"
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.PIPE)
-        
-        # Give the server time to start
-        time.sleep(5)
-        
-        # Test 1: Check server status
-        print("\nTest 1: Checking server status...")
-        status_request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": "get_server_status",
-                "arguments": {}
-            }
-        }
-        
-        process.stdin.write((json.dumps(status_request) + "\n").encode())
-        process.stdin.flush()
+        cls.server = ServerClient()
+        # A class cleanup still runs when start() fails part way, unlike tearDownClass
+        cls.addClassCleanup(cls.server.stop)
+        cls.server.start()
         
-        response_line = process.stdout.readline().decode().strip()
-        if response_line:
-            response = json.loads(response_line)
-            print(f"Server status: {response}")
-        
-        # Test 2: Get available languages
-        print("\nTest 2: Getting available languages...")
-        languages_request = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/call",
-            "params": {
-                "name": "get_available_languages",
-                "arguments": {}
-            }
-        }
-        
-        process.stdin.write((json.dumps(languages_request) + "\n").encode())
-        process.stdin.flush()
-        
-        response_line = process.stdout.readline().decode().strip()
-        if response_line:
-            response = json.loads(response_line)
-            print(f"Available languages: {response}")
-        
-        # Test 3: Generate simple Python code
-        print("\nTest 3: Generating Python code...")
-        code_request = {
-            "jsonrpc": "2.0",
-            "id": 3,
-            "method": "tools/call",
-            "params": {
-                "name": "generate_code_with_context",
-                "arguments": {
-                    "request": "Create a simple function to calculate the factorial of a number",
-                    "language": "python",
-                    "include_tests": True,
-                    "include_docs": True
-                }
-            }
-        }
-        
-        process.stdin.write((json.dumps(code_request) + "\n").encode())
-        process.stdin.flush()
-        
-        response_line = process.stdout.readline().decode().strip()
-        if response_line:
-            response = json.loads(response_line)
-            print(f"Generated code: {response}")
-        
-        print("\nTests completed successfully!")
-        return True
-        
-    except Exception as e:
-        print(f"Test failed: {e}")
-        return False
+        # Pipeline every call instead of waiting on each round trip; tests then check their own response
+        cls.responses = dict(zip(TOOL_CALLS, cls.server.call_many(list(TOOL_CALLS.values()))))
+        for name, response in cls.responses.items():
+            log.debug("%s: %r", name, response)
     
-    finally:
-        # Clean up
-        try:
-            process.terminate()
-            process.wait(timeout=5)
-        except:
-            process.kill()
+    def tool_text(self, name: str) -> str:
+        """Assert a tool call succeeded and return its text content"""
+        response = self.responses[name]
+        self.assertNotIn("error", response)
+        self.assertFalse(response["result"].get("isError"), response["result"])
+        return "".join(block.get("text", "") for block in response["result"]["content"])
+    
+    def test_server_status(self):
+        status = _loads(self.tool_text("status"))
+        self.assertEqual(status["standards_server"], "running")
+        self.assertEqual(status["context7_server"], "running")
+        self.assertTrue(status["agent_ready"])
+    
+    def test_available_languages(self):
+        self.assertIn("python", _loads(self.tool_text("languages")))
+    
+    def test_generate_code(self):
+        code = self.tool_text("code")
+        # Generation failures come back as ordinary text rather than as tool errors
+        self.assertFalse(code.startswith("Error"), code)
+        self.assertIn("def ", code)
+        self.assertIn("factorial", code.lower())
 
-def test_simple_import():
-    """Test if we can import the required modules"""
-    print("Testing module imports...")
+# Modules the server needs, mapped to the pip package that provides each (uvloop is optional)
+REQUIRED_MODULES = {
+    "fastmcp": "fastmcp",
+    "agents": "openai-agents",
+    "pydantic": "pydantic",
+    "orjson": "orjson",
+    "simdjson": "pysimdjson",
+    "ahocorasick": "pyahocorasick",
+}
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Check whether a module can be imported, without running its import"""
+    return name in sys.modules or importlib.util.find_spec(name) is not None
+
+def check_imports() -> List[str]:
+    """Check that the required modules are installed, returning the pip packages that are missing"""
+    print("Checking module availability...")
     
-    try:
-        import fastmcp
-        print("✓ fastmcp imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import fastmcp: {e}")
-        return False
+    missing = []
+    for module, package in REQUIRED_MODULES.items():
+        if module_available(module):
+            print(f"✓ {package} is available")
+        else:
+            print(f"✗ {package} is not installed")
+            missing.append(package)
     
-    try:
-        import agents
-        print("✓ openai-agents imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import openai-agents: {e}")
-        print("Install with: pip install openai-agents")
-        return False
+    if not missing:
+        print("All modules are available!")
+    return missing
+
+def load_server_module():
+    """Import code-assistant-server.py, whose file name isn't a valid module name"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "code-assistant-server.py")
+    spec = importlib.util.spec_from_file_location("code_assistant_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@unittest.skipUnless(all(map(module_available, REQUIRED_MODULES)), "server dependencies are not installed")
+class ServerHelpersTest(unittest.TestCase):
+    """Pure helpers in the server module; these need neither a server nor an API key"""
     
-    try:
-        import pydantic
-        print("✓ pydantic imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import pydantic: {e}")
-        return False
+    @classmethod
+    def setUpClass(cls):
+        cls.server = load_server_module()
+    
+    def test_library_id_pattern(self):
+        text = ("- Title: Next.js\n"
+                "- Context7-compatible library ID: /vercel/next.js\n"
+                "- Description: The React Framework")
+        match = self.server.LIBRARY_ID_PATTERN.search(text)
+        self.assertEqual(match.group(1), "/vercel/next.js")
+        self.assertIsNone(self.server.LIBRARY_ID_PATTERN.search("No libraries found"))
+    
+    def test_parse_message_small_and_large(self):
+        small = b'{"id":1,"result":{"contents":[{"text":"hi"}]}}\n'
+        large = _dumps({"id": 2, "result": {"content": [{"text": "x" * 500}]}}) + b"\n"
+        self.assertEqual(self.server.value_at(self.server.parse_message(small), "/result/contents/0/text"), "hi")
+        blocks = self.server.value_at(self.server.parse_message(large), "/result/content")
+        self.assertEqual(blocks, [{"text": "x" * 500}])
+        self.assertIsInstance(blocks, list)
+    
+    def test_parse_message_falls_back_to_orjson(self):
+        payload = _dumps({"id": 3, "result": {"text": "y" * 500}})
+        # Pin this thread's simdjson parser with a live Array so only orjson can parse
+        held = self.server._json_parser().parse(_dumps(["z" * 500])).at_pointer("")
+        self.assertEqual(self.server.value_at(self.server.parse_message(payload), "/id"), 3)
+        del held
+    
+    def test_value_at_missing_pointer(self):
+        for payload in (b'{"id":1,"error":{"code":-1}}', _dumps({"id": 1, "error": {"message": "e" * 500}})):
+            with self.assertRaises(KeyError):
+                self.server.value_at(self.server.parse_message(payload), "/result/content")
+    
+    def test_iter_text_blocks(self):
+        blocks = [{"type": "text", "text": "a"}, {"type": "image", "data": "..."}, "junk", {"text": "b"}]
+        self.assertEqual(list(self.server.iter_text_blocks(blocks)), ["a", "b"])
+        self.assertEqual(list(self.server.iter_text_blocks(None)), [])
+    
+    def test_keyword_tags(self):
+        self.assertEqual(self.server.keyword_tags("Build a REST API over Pandas data"), {"api", "data"})
+        self.assertEqual(self.server.keyword_tags("Write unittest coverage for an HTML page"), {"testing", "web"})
+        self.assertEqual(self.server.keyword_tags("sort a list"), set())
+    
+    def test_fast_path_gate(self):
+        use_fast_path = self.server.use_fast_path
+        with unittest.mock.patch.object(self.server, "FAST_PATH_ENABLED", True):
+            self.assertTrue(use_fast_path("A simple factorial", "Python", None, False))
+            self.assertFalse(use_fast_path("a simple fizzbuzz", "rust", None, False))
+            self.assertFalse(use_fast_path("A simple factorial", "python", ["numpy"], False))
+            self.assertFalse(use_fast_path("A simple factorial", "python", None, True))
+            self.assertFalse(use_fast_path("A factorial", "python", None, False))
+        with unittest.mock.patch.object(self.server, "FAST_PATH_ENABLED", False):
+            self.assertFalse(use_fast_path("A simple factorial", "python", None, False))
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def live_pool(name):
+        """Stand-in for server_manager.acquire on a pool with a live client"""
+        yield object()
+    
+    def fast_path_answer(self, acquire, checklist=None):
+        """Ask for simple Python code with the standards pool and the agent stubbed out"""
+        server = self.server
+        
+        async def call(client, method, params, pointer="/result"):
+            return checklist
+        
+        async def generate_code(code_request):
+            return "AGENT"
+        
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(unittest.mock.patch.object(server, "FAST_PATH_ENABLED", True))
+            stack.enter_context(unittest.mock.patch.dict(server.server_manager.pool_commands, {"standards": ["standards"]}))
+            stack.enter_context(unittest.mock.patch.object(server.server_manager, "acquire", acquire))
+            stack.enter_context(unittest.mock.patch.object(server, "_call", call))
+            stack.enter_context(unittest.mock.patch.object(server.code_agent, "generate_code", generate_code))
+            # fetch_checklist reports why a pool gave up on stderr
+            stack.enter_context(contextlib.redirect_stderr(io.StringIO()))
+            cache = stack.enter_context(unittest.mock.patch.dict(server._checklist_cache, clear=True))
+            return server.generate_code_with_context("A simple factorial", "Python"), dict(cache)
+    
+    def test_fast_path_falls_back_to_agent(self):
+        def dead_pool(name):
+            raise RuntimeError(f"No {name} server is running")
+        
+        not_found = self.server.CHECKLIST_NOT_FOUND + "\n\nNo checklist for python"
+        self.assertEqual(self.fast_path_answer(self.live_pool, not_found), ("AGENT", {}))
+        self.assertEqual(self.fast_path_answer(self.live_pool, None), ("AGENT", {}))
+        self.assertEqual(self.fast_path_answer(dead_pool), ("AGENT", {}))
     
-    print("All modules imported successfully!")
-    return True
+    def test_fast_path_renders_checklist(self):
+        checklist = "# Python Code Review Checklist\n- [ ] Follows PEP 8 guidelines"
+        answer, cache = self.fast_path_answer(self.live_pool, checklist)
+        self.assertTrue(answer.startswith("# Python: A simple factorial"))
+        self.assertIn("No code was generated", answer)
+        self.assertTrue(answer.endswith(checklist))
+        self.assertEqual(cache, {"python": checklist})
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("MCP_TEST_LOG", "INFO").upper(), format="%(message)s", stream=sys.stdout)
     print("Code Assistant MCP Server Test Suite")
     print("=" * 40)
     
-    # Test imports first
-    if not test_simple_import():
+    # Check imports first
+    missing = check_imports()
+    if missing:
         print("\nPlease install missing dependencies:")
-        print("pip install -r requirements.txt")
+        print(f"pip install {' '.join(missing)}")
         sys.exit(1)
     
     print("\n" + "=" * 40)
     
-    # Test the server functionality
-    if test_code_assistant():
-        print("\n✓ All tests passed!")
-    else:
-        print("\n✗ Some tests failed!")
-        sys.exit(1)
\ No newline at end of file
+    unittest.main(verbosity=2)
\ No newline at end of file